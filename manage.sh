@@ -561,6 +561,7 @@ configure_vllm_single_gpu() {
     log "INFO" "🔧 Configuring vLLM for single GPU mode..."
     # This would modify environment variables for single GPU
     export VLLM_GPU_COUNT=1
+    export VLLM_DATA_PARALLEL_SIZE=1
     export CUDA_VISIBLE_DEVICES=0
     return 0
 }
@@ -178,44 +178,38 @@ export class CanvasRAGAPIServer {
           res.setHeader('Connection', 'keep-alive');
           res.setHeader('X-Accel-Buffering', 'no');
           
-          const words = responseContent.split(' ');
-          let i = 0;
-          
-          const streamInterval = setInterval(() => {
-            if (i < words.length) {
-              const chunk = {
-                id: responseId,
-                object: 'chat.completion.chunk',
-                created,
-                model: request.model || 'canvasbot',
-                choices: [{
-                  index: 0,
-                  delta: {
-                    content: words[i] + ' '
-                  },
-                  finish_reason: null
-                }]
-              };
-              res.write(`data: ${JSON.stringify(chunk)}\n\n`);
-              i++;
-            } else {
-              const finalChunk = {
-                id: responseId,
-                object: 'chat.completion.chunk',
-                created,
-                model: request.model || 'canvasbot',
-                choices: [{
-                  index: 0,
-                  delta: {},
-                  finish_reason: 'stop'
-                }]
-              };
-              res.write(`data: ${JSON.stringify(finalChunk)}\n\n`);
-              res.write('data: [DONE]\n\n');
-              res.end();
-              clearInterval(streamInterval);
-            }
-          }, 50); // Adjust speed as needed
+          // The answer is already complete, so send it in one buffered write
+          // instead of replaying it word by word on a timer
+          const contentChunk = {
+            id: responseId,
+            object: 'chat.completion.chunk',
+            created,
+            model: request.model || 'canvasbot',
+            choices: [{
+              index: 0,
+              delta: {
+                content: responseContent
+              },
+              finish_reason: null
+            }]
+          };
+          const finalChunk = {
+            id: responseId,
+            object: 'chat.completion.chunk',
+            created,
+            model: request.model || 'canvasbot',
+            choices: [{
+              index: 0,
+              delta: {},
+              finish_reason: 'stop'
+            }]
+          };
+          res.write(
+            `data: ${JSON.stringify(contentChunk)}\n\n` +
+            `data: ${JSON.stringify(finalChunk)}\n\n` +
+            'data: [DONE]\n\n'
+          );
+          res.end();
           
         } else {
           // Non-streaming response
@@ -232,10 +226,11 @@ export class CanvasRAGAPIServer {
               },
               finish_reason: 'stop'
             }],
-            usage: {
-              prompt_tokens: userMessage.content.length,
-              completion_tokens: responseContent.length,
-              total_tokens: userMessage.content.length + responseContent.length
+            // Usage is absent when the answer did not come from the LLM
+            usage: result.usage ?? {
+              prompt_tokens: 0,
+              completion_tokens: 0,
+              total_tokens: 0
             }
           };
 
@@ -261,11 +256,13 @@ export class CanvasRAGAPIServer {
     // System status
     this.app.get('/canvas/status', async (req, res) => {
       try {
+        // Load the cached data once; only its timestamp outlives this handler
+        const studentData = await this.storage.loadStudentData();
         const status = {
           initialized: this.isInitialized,
           canvas_connected: await this.canvasService.testConnection(),
-          data_available: !!(await this.storage.loadStudentData()),
-          last_updated: (await this.storage.loadStudentData())?.lastUpdated
+          data_available: !!studentData,
+          last_updated: studentData?.lastUpdated
         };
         res.json(status);
       } catch (error) {
@@ -3,11 +3,27 @@ import axios from 'axios';
 
 export interface VLLMConfig {
   model: string;
+  /** GPUs the server may use, as a CUDA_VISIBLE_DEVICES list. */
+  visibleDevices?: string;
   host?: string;
   port?: number;
   tensorParallelSize?: number;
+  dataParallelSize?: number;
   maxModelLen?: number;
   gpuMemoryUtilization?: number;
+  maxNumSeqs?: number;
+  maxNumBatchedTokens?: number;
+  quantization?: string;
+  kvCacheDtype?: string;
+  /** How vLLM runs its per-GPU workers; vLLM picks one when unset. */
+  distributedExecutorBackend?: 'mp' | 'ray';
+  /**
+   * Scheduled-token counts to capture CUDA graphs for. When unset, covers up
+   * to maxNumSeqs * (1 + num_speculative_tokens), capped at maxNumBatchedTokens.
+   */
+  cudaGraphCaptureSizes?: number[];
+  /** Passed to --speculative-config; set to null to disable speculative decoding. */
+  speculativeConfig?: Record<string, unknown> | null;
 }
 
 export interface VLLMResponse {
@@ -15,20 +31,72 @@ export interface VLLMResponse {
   finishReason: string;
 }
 
+/** Prompt text, or token ids from the served model's tokenizer. */
+export type PromptInput = string | number[];
+
+export interface GenerateOptions {
+  temperature?: number;
+  maxTokens?: number;
+  topP?: number;
+  /**
+   * Request timeout in milliseconds. Defaults to 30s for each round of
+   * maxNumSeqs prompts in the batch.
+   */
+  timeoutMs?: number;
+}
+
+/** Powers of two below max, followed by max itself. */
+function captureSizesUpTo(max: number): number[] {
+  const sizes: number[] = [];
+  for (let size = 1; size < max; size *= 2) {
+    sizes.push(size);
+  }
+  sizes.push(max);
+  return sizes;
+}
+
 export class VLLMClient {
   private config: VLLMConfig;
   private process: ChildProcess | null = null;
   private baseUrl: string;
 
   constructor(config: VLLMConfig) {
+    const tensorParallelSize = config.tensorParallelSize ?? 1;
+    // Respect a device list already set for this process rather than
+    // overriding it with a fixed one; otherwise use all 3 GPUs
+    const visibleDevices = config.visibleDevices ?? process.env.CUDA_VISIBLE_DEVICES ?? '0,1,2';
+    // One engine with a replica per GPU group instead of one server per GPU,
+    // so weights load once per replica and requests are balanced across them
+    const gpuCount = visibleDevices.split(',').length;
+
     this.config = {
+      visibleDevices,
       host: 'localhost',
       port: 8000,
-      tensorParallelSize: 1,
+      tensorParallelSize,
+      dataParallelSize: Math.max(1, Math.floor(gpuCount / tensorParallelSize)),
       maxModelLen: 4096,
-      gpuMemoryUtilization: 0.8,
+      // The FP8 KV cache leaves enough headroom to give vLLM more of each GPU
+      gpuMemoryUtilization: 0.92,
+      // Sized for a handful of concurrent chat requests, not vLLM's batch defaults
+      maxNumSeqs: 8,
+      maxNumBatchedTokens: 4096,
+      kvCacheDtype: 'fp8',
+      // Answers repeat names and dates from the retrieved context, which
+      // prompt-lookup (n-gram) drafting predicts well
+      speculativeConfig: { method: 'ngram', num_speculative_tokens: 5, prompt_lookup_max: 4 },
       ...config
     };
+    // Capture sizes count scheduled tokens, and each decoding sequence
+    // schedules one token plus its speculative drafts per step; a step never
+    // schedules more than maxNumBatchedTokens
+    const draftTokens = Number(this.config.speculativeConfig?.num_speculative_tokens ?? 0);
+    const maxScheduledTokens = Math.min(
+      this.config.maxNumSeqs! * (1 + draftTokens),
+      this.config.maxNumBatchedTokens!
+    );
+    this.config.cudaGraphCaptureSizes = config.cudaGraphCaptureSizes
+      ?? captureSizesUpTo(maxScheduledTokens);
     this.baseUrl = `http://${this.config.host}:${this.config.port}`;
   }
 
@@ -46,14 +114,49 @@ export class VLLMClient {
       '--host', this.config.host!,
       '--port', this.config.port!.toString(),
       '--tensor-parallel-size', this.config.tensorParallelSize!.toString(),
+      '--data-parallel-size', this.config.dataParallelSize!.toString(),
       '--max-model-len', this.config.maxModelLen!.toString(),
       '--gpu-memory-utilization', this.config.gpuMemoryUtilization!.toString(),
+      '--max-num-seqs', this.config.maxNumSeqs!.toString(),
+      '--max-num-batched-tokens', this.config.maxNumBatchedTokens!.toString(),
+      '--kv-cache-dtype', this.config.kvCacheDtype!,
+      // Split long prefills so they share steps with in-flight decodes
+      '--enable-chunked-prefill',
+      '--enable-prefix-caching',
       '--trust-remote-code'
     ];
 
+    if (this.config.quantization) {
+      args.push('--quantization', this.config.quantization);
+    }
+
+    if (this.config.distributedExecutorBackend) {
+      args.push('--distributed-executor-backend', this.config.distributedExecutorBackend);
+    }
+
+    if (this.config.speculativeConfig) {
+      args.push('--speculative-config', JSON.stringify(this.config.speculativeConfig));
+    }
+
+    // vLLM captures these graphs while the server starts, before /health
+    // reports ready, so no request-time warmup is needed
+    if (this.config.cudaGraphCaptureSizes) {
+      args.push('--compilation-config', JSON.stringify({
+        cudagraph_capture_sizes: this.config.cudaGraphCaptureSizes
+      }));
+    }
+
     this.process = spawn('python', args, {
       cwd: process.cwd(),
-      env: { ...process.env, CUDA_VISIBLE_DEVICES: '0,1,2' } // Use all 3 GPUs
+      env: {
+        NCCL_DEBUG: 'WARN',
+        VLLM_WORKER_MULTIPROC_METHOD: 'spawn',
+        // Fused attention kernels that also read the FP8 KV cache
+        VLLM_ATTENTION_BACKEND: 'FLASHINFER',
+        ...process.env,
+        // Set before the child starts so vLLM initializes CUDA on these GPUs only
+        CUDA_VISIBLE_DEVICES: this.config.visibleDevices
+      }
     });
 
     this.process.stdout?.on('data', (data) => {
@@ -64,12 +167,35 @@ export class VLLMClient {
       console.error(`vLLM Error: ${data}`);
     });
 
+    // Clear the handle if the child dies or never starts, so waitForServer()
+    // stops polling; stopServer() clears it first, so a requested stop is quiet
+    const child = this.process;
+    child.on('exit', (code, signal) => {
+      if (this.process !== child) {
+        return;
+      }
+      console.error(`vLLM server exited (code: ${code}, signal: ${signal})`);
+      this.process = null;
+    });
+
+    child.on('error', (error) => {
+      console.error('Failed to start vLLM server:', error);
+      if (this.process === child) {
+        this.process = null;
+      }
+    });
+
     // Wait for server to be ready
     await this.waitForServer();
   }
 
   private async waitForServer(maxAttempts = 60): Promise<void> {
     for (let i = 0; i < maxAttempts; i++) {
+      // Stop polling as soon as the server process has died
+      if (!this.process) {
+        throw new Error('vLLM server exited before becoming ready');
+      }
+
       try {
         await axios.get(`${this.baseUrl}/health`);
         console.log('vLLM server is ready!');
@@ -82,30 +208,55 @@ export class VLLMClient {
     throw new Error('vLLM server failed to start');
   }
 
-  async generate(prompt: string, options: {
-    temperature?: number;
-    maxTokens?: number;
-    topP?: number;
-  } = {}): Promise<VLLMResponse> {
+  async generate(prompt: PromptInput, options: GenerateOptions = {}): Promise<VLLMResponse> {
+    const [response] = await this.generateBatch([prompt], options);
+    return response;
+  }
+
+  /**
+   * Submits all prompts in a single completions request so the engine can
+   * schedule them together; responses are returned in prompt order. A batch
+   * should be either all text or all token ids.
+   */
+  async generateBatch(prompts: PromptInput[], options: GenerateOptions = {}): Promise<VLLMResponse[]> {
+    if (prompts.length === 0) {
+      return [];
+    }
+
+    // Submit longest prompts first so prefill steps pack similar lengths
+    // together; order[i] is the caller's index of the i-th submitted prompt
+    const order = prompts
+      .map((_, index) => index)
+      .sort((a, b) => prompts[b].length - prompts[a].length);
+
     const requestBody = {
       model: this.config.model,
-      prompt,
+      prompt: order.map(index => prompts[index]),
       temperature: options.temperature || 0.1,
       max_tokens: options.maxTokens || 500,
       top_p: options.topP || 0.9,
       stream: false
     };
 
+    // One request carries the whole batch, and the engine decodes at most
+    // maxNumSeqs of its prompts at a time
+    const rounds = Math.ceil(prompts.length / this.config.maxNumSeqs!);
+    const timeout = options.timeoutMs ?? 30000 * rounds;
+
     try {
       const response = await axios.post(`${this.baseUrl}/v1/completions`, requestBody, {
         headers: { 'Content-Type': 'application/json' },
-        timeout: 30000
+        timeout
       });
 
-      return {
-        text: response.data.choices[0].text.trim(),
-        finishReason: response.data.choices[0].finish_reason
-      };
+      const results: VLLMResponse[] = new Array(prompts.length);
+      for (const choice of response.data.choices) {
+        results[order[choice.index]] = {
+          text: choice.text.trim(),
+          finishReason: choice.finish_reason
+        };
+      }
+      return results;
     } catch (error) {
       console.error('vLLM generation error:', error);
       throw error;
@@ -119,4 +270,5 @@ export class VLLMClient {
       console.log('vLLM server stopped');
     }
   }
-}
\ No newline at end of file
+}
+
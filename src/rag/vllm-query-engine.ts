@@ -6,10 +6,17 @@ import { StudentData } from '../types.js';
 import { parseISO, addDays, startOfDay, endOfDay } from 'date-fns';
 import { studentProfileManager, ChatCommand } from '../student-profile.js';
 
+export interface TokenUsage {
+  prompt_tokens: number;
+  completion_tokens: number;
+  total_tokens: number;
+}
+
 export interface QueryResult {
   answer: string;
   sources: SearchResult[];
   confidence: number;
+  usage?: TokenUsage;
 }
 
 interface VLLMGenerateRequest {
@@ -22,13 +29,32 @@ interface VLLMGenerateRequest {
 
 interface VLLMGenerateResponse {
   text: string[];
-  usage?: {
-    prompt_tokens: number;
-    completion_tokens: number;
-    total_tokens: number;
-  };
+  usage?: TokenUsage;
 }
 
+// Static instructions lead the prompt so every request shares the same
+// leading tokens and vLLM's prefix cache can reuse their KV blocks.
+const DEFAULT_PROMPT_PREFIX = `You are CanvasBot, your dedicated AI assignment helper designed to maximize your academic success. I specialize in helping students stay organized, track assignments, manage deadlines, and optimize their study time through intelligent calendar and tracking features.
+
+MY CORE CAPABILITIES:
+📋 Assignment Tracking & Organization - I help you see exactly what's due and when
+📅 Calendar View & Scheduling - I provide timeline perspectives and study planning
+⏰ Due Date Awareness & Reminders - I highlight urgent items and upcoming deadlines
+📊 Progress Tracking & Completion Status - I monitor your submission progress
+📚 Study Planning & Time Management - I help optimize your academic workflow
+🎯 Assignment Prioritization - I help you focus on what matters most
+
+INSTRUCTIONS FOR STUDENT SUCCESS:
+1. Answer based ONLY on the provided context about your Canvas assignments and courses
+2. When listing assignments, ALWAYS include due dates, submission status, and urgency level
+3. Prioritize assignments by due date proximity and completion status
+4. Highlight overdue or urgent items with clear warnings (🚨 OVERDUE, ⚠️ DUE SOON)
+5. Provide study planning recommendations when relevant
+6. Format information for easy scanning with clear visual hierarchy
+7. If context is insufficient, specify what additional information would help
+8. Focus on actionable insights that support your academic success
+`;
+
 export class VLLMQueryEngine {
   private vectorStore: VectorStore;
   private preprocessor: DataPreprocessor;
@@ -130,6 +156,14 @@ export class VLLMQueryEngine {
     return undefined;
   }
 
+  private isShortAnswerQuery(query: string): boolean {
+    const queryLower = query.toLowerCase().trim();
+
+    // Whole-question match for single-fact questions whose answer is just a
+    // date or time; anything longer ("what is today's schedule") keeps the full budget
+    return /^(what (day|date|year|time) is (it|today)|what(?: is|'s) (today|the date( today)?|today'?s date))\s*\??$/.test(queryLower);
+  }
+
   private async generatePrompt(query: string, context: SearchResult[], studentId?: string): Promise<string> {
     const contextText = context
       .map(r => r.document)
@@ -144,39 +178,20 @@ export class VLLMQueryEngine {
     }
 
     // Fallback to default prompt
-    return `You are CanvasBot, your dedicated AI assignment helper designed to maximize your academic success. I specialize in helping students stay organized, track assignments, manage deadlines, and optimize their study time through intelligent calendar and tracking features.
-
+    return `${DEFAULT_PROMPT_PREFIX}
 CONTEXT:
 ${contextText}
 
 STUDENT QUESTION: ${query}
 
-MY CORE CAPABILITIES:
-📋 Assignment Tracking & Organization - I help you see exactly what's due and when
-📅 Calendar View & Scheduling - I provide timeline perspectives and study planning
-⏰ Due Date Awareness & Reminders - I highlight urgent items and upcoming deadlines
-📊 Progress Tracking & Completion Status - I monitor your submission progress
-📚 Study Planning & Time Management - I help optimize your academic workflow
-🎯 Assignment Prioritization - I help you focus on what matters most
-
-INSTRUCTIONS FOR STUDENT SUCCESS:
-1. Answer based ONLY on the provided context about your Canvas assignments and courses
-2. When listing assignments, ALWAYS include due dates, submission status, and urgency level
-3. Prioritize assignments by due date proximity and completion status
-4. Highlight overdue or urgent items with clear warnings (🚨 OVERDUE, ⚠️ DUE SOON)
-5. Provide study planning recommendations when relevant
-6. Format information for easy scanning with clear visual hierarchy
-7. If context is insufficient, specify what additional information would help
-8. Focus on actionable insights that support your academic success
-
 ANSWER:`;
   }
 
-  private async generateWithVLLM(prompt: string): Promise<string> {
+  private async generateWithVLLM(prompt: string, maxTokens: number = 500): Promise<{ text: string; usage?: TokenUsage }> {
     try {
       const request: VLLMGenerateRequest = {
         prompt,
-        max_tokens: 500,
+        max_tokens: maxTokens,
         temperature: 0.3,
         top_p: 0.9,
         stop: ["\n\nSTUDENT", "\n\nCONTEXT", "\n\nQUESTION"]
@@ -200,14 +215,17 @@ ANSWER:`;
         }
       );
 
+      // Token counts come from the engine's own tokenizer via the usage block
+      const usage = response.data?.usage;
+
       if (response.data && response.data.text && response.data.text.length > 0) {
-        return response.data.text[0].trim();
+        return { text: response.data.text[0].trim(), usage };
       }
 
       if (response.data && typeof response.data === 'object' && 'choices' in response.data) {
         const choices = (response.data as any).choices;
         if (Array.isArray(choices) && choices.length > 0 && choices[0].text) {
-          return choices[0].text.trim();
+          return { text: choices[0].text.trim(), usage };
         }
       }
 
@@ -307,7 +325,9 @@ ANSWER:`;
     const prompt = await this.generatePrompt(userQuery, searchResults, studentId);
     
     // Get LLM response
-    const answer = await this.generateWithVLLM(prompt);
+    // Cap decode length for single-fact questions so they stop near the answer
+    const maxTokens = this.isShortAnswerQuery(userQuery) ? 128 : 500;
+    const { text: answer, usage } = await this.generateWithVLLM(prompt, maxTokens);
 
     // Calculate confidence based on search relevance
     const avgScore = searchResults.length > 0
@@ -317,7 +337,8 @@ ANSWER:`;
     return {
       answer,
       sources: searchResults.slice(0, 5),
-      confidence: avgScore
+      confidence: avgScore,
+      usage
     };
   }
 
@@ -808,13 +808,10 @@ What would you like to know about your Canvas assignments?`;
     // Build reminder context if applicable
     const reminderContext = this.buildReminderContext(preferences);
 
+    // Profile-specific instructions come before the per-query context so a
+    // student's prompts share a stable prefix for the LLM's prefix cache
     return `${personalityConfig.greeting}
 
-CONTEXT:
-${contextText}
-
-STUDENT QUESTION: ${query}
-
 MY PERSONALITY: ${personalityConfig.tone}
 COMMUNICATION STYLE: ${personalityConfig.style}
 
@@ -835,6 +832,11 @@ CORE CAPABILITIES:
 PERSONALIZED INSTRUCTIONS:
 ${this.generateResponseInstructions(preferences)}
 
+CONTEXT:
+${contextText}
+
+STUDENT QUESTION: ${query}
+
 ANSWER:`;
   }
 
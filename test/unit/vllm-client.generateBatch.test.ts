@@ -0,0 +1,105 @@
+import { VLLMClient } from '../../src/rag/vllm-client';
+import axios from 'axios';
+
+// Mock axios
+jest.mock('axios');
+const mockedAxios = jest.mocked(axios);
+
+// Mock console methods to reduce noise
+const consoleError = jest.spyOn(console, 'error').mockImplementation(() => {});
+
+describe('VLLMClient.generateBatch', () => {
+  let client: VLLMClient;
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    client = new VLLMClient({ model: 'Qwen/Qwen2.5-7B-Instruct' });
+  });
+
+  it('should submit all prompts in a single completions request', async () => {
+    mockedAxios.post.mockResolvedValueOnce({
+      data: {
+        choices: [
+          { index: 0, text: ' 2025', finish_reason: 'stop' },
+          { index: 1, text: ' 2024', finish_reason: 'stop' }
+        ]
+      }
+    });
+
+    await client.generateBatch(['What year is it?', 'What year is next year?']);
+
+    expect(mockedAxios.post).toHaveBeenCalledTimes(1);
+    expect(mockedAxios.post.mock.calls[0][1]).toMatchObject({
+      prompt: ['What year is next year?', 'What year is it?']
+    });
+  });
+
+  it('should return responses in prompt order regardless of choice order', async () => {
+    mockedAxios.post.mockResolvedValueOnce({
+      data: {
+        choices: [
+          { index: 1, text: ' second ', finish_reason: 'length' },
+          { index: 0, text: ' first ', finish_reason: 'stop' }
+        ]
+      }
+    });
+
+    const results = await client.generateBatch(['a', 'b']);
+
+    expect(results).toEqual([
+      { text: 'first', finishReason: 'stop' },
+      { text: 'second', finishReason: 'length' }
+    ]);
+  });
+
+  it('should submit longer prompts first and map responses back to prompt order', async () => {
+    mockedAxios.post.mockResolvedValueOnce({
+      data: {
+        choices: [
+          { index: 0, text: 'long answer', finish_reason: 'stop' },
+          { index: 1, text: 'medium answer', finish_reason: 'stop' },
+          { index: 2, text: 'short answer', finish_reason: 'stop' }
+        ]
+      }
+    });
+
+    const results = await client.generateBatch(['short', 'a much longer prompt', 'medium one']);
+
+    expect(mockedAxios.post.mock.calls[0][1]).toMatchObject({
+      prompt: ['a much longer prompt', 'medium one', 'short']
+    });
+    expect(results.map(r => r.text)).toEqual(['short answer', 'long answer', 'medium answer']);
+  });
+
+  it('should not call the server for an empty batch', async () => {
+    const results = await client.generateBatch([]);
+
+    expect(results).toEqual([]);
+    expect(mockedAxios.post).not.toHaveBeenCalled();
+  });
+
+  it('should scale the default timeout with the number of prompts', async () => {
+    mockedAxios.post.mockResolvedValue({ data: { choices: [] } });
+
+    await client.generateBatch(['a']);
+    // Default maxNumSeqs of 8, so 20 prompts take three rounds
+    await client.generateBatch(Array(20).fill('a'));
+
+    expect(mockedAxios.post.mock.calls[0][2]).toMatchObject({ timeout: 30000 });
+    expect(mockedAxios.post.mock.calls[1][2]).toMatchObject({ timeout: 90000 });
+  });
+
+  it('should use an explicit timeout when one is given', async () => {
+    mockedAxios.post.mockResolvedValueOnce({ data: { choices: [] } });
+
+    await client.generateBatch(Array(20).fill('a'), { timeoutMs: 5000 });
+
+    expect(mockedAxios.post.mock.calls[0][2]).toMatchObject({ timeout: 5000 });
+  });
+
+  it('should rethrow server errors', async () => {
+    mockedAxios.post.mockRejectedValueOnce(new Error('connection refused'));
+
+    await expect(client.generateBatch(['a'])).rejects.toThrow('connection refused');
+  });
+});
@@ -0,0 +1,123 @@
+import { VLLMClient } from '../../src/rag/vllm-client';
+import { spawn } from 'child_process';
+import { EventEmitter } from 'events';
+import axios from 'axios';
+
+// Mock the server process and its health endpoint
+jest.mock('child_process');
+jest.mock('axios');
+const mockedSpawn = jest.mocked(spawn);
+const mockedAxios = jest.mocked(axios);
+
+function createFakeChild() {
+  return Object.assign(new EventEmitter(), {
+    stdout: new EventEmitter(),
+    stderr: new EventEmitter(),
+    kill: jest.fn()
+  });
+}
+
+describe('VLLMClient.startServer', () => {
+  let client: VLLMClient;
+  let child: ReturnType<typeof createFakeChild>;
+  let consoleError: jest.SpyInstance;
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.useFakeTimers();
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+    consoleError = jest.spyOn(console, 'error').mockImplementation(() => {});
+
+    child = createFakeChild();
+    mockedSpawn.mockReturnValue(child as any);
+    client = new VLLMClient({ model: 'Qwen/Qwen2.5-7B-Instruct' });
+  });
+
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it('should reject once the server process exits before becoming ready', async () => {
+    mockedAxios.get.mockRejectedValue(new Error('connect ECONNREFUSED'));
+
+    const started = client.startServer();
+    const assertion = expect(started).rejects.toThrow('vLLM server exited before becoming ready');
+    child.emit('exit', 1, null);
+
+    await jest.advanceTimersByTimeAsync(5000);
+    await assertion;
+    expect(mockedAxios.get).toHaveBeenCalledTimes(1);
+  });
+
+  it('should reject instead of crashing when the process fails to spawn', async () => {
+    mockedAxios.get.mockRejectedValue(new Error('connect ECONNREFUSED'));
+
+    const started = client.startServer();
+    const assertion = expect(started).rejects.toThrow('vLLM server exited before becoming ready');
+    child.emit('error', new Error('spawn python ENOENT'));
+
+    await jest.advanceTimersByTimeAsync(5000);
+    await assertion;
+  });
+
+  it('should allow a restart after the process has exited', async () => {
+    mockedAxios.get.mockRejectedValueOnce(new Error('connect ECONNREFUSED'));
+
+    const first = client.startServer();
+    const assertion = expect(first).rejects.toThrow();
+    child.emit('exit', 1, null);
+    await jest.advanceTimersByTimeAsync(5000);
+    await assertion;
+
+    mockedAxios.get.mockResolvedValueOnce({ status: 200 });
+    await client.startServer();
+
+    expect(mockedSpawn).toHaveBeenCalledTimes(2);
+  });
+
+  it('should not report an error when the server is stopped on request', async () => {
+    mockedAxios.get.mockResolvedValueOnce({ status: 200 });
+    await client.startServer();
+
+    await client.stopServer();
+    child.emit('exit', null, 'SIGTERM');
+
+    expect(child.kill).toHaveBeenCalled();
+    expect(consoleError).not.toHaveBeenCalled();
+  });
+
+  it('should capture CUDA graphs up to the configured maxNumSeqs', async () => {
+    mockedAxios.get.mockResolvedValueOnce({ status: 200 });
+    client = new VLLMClient({ model: 'Qwen/Qwen2.5-7B-Instruct', maxNumSeqs: 12, speculativeConfig: null });
+
+    await client.startServer();
+
+    const args = mockedSpawn.mock.calls[0][1] as string[];
+    const compilationConfig = JSON.parse(args[args.indexOf('--compilation-config') + 1]);
+    expect(compilationConfig.cudagraph_capture_sizes).toEqual([1, 2, 4, 8, 12]);
+  });
+
+  it('should leave room for speculative draft tokens in the capture sizes', async () => {
+    mockedAxios.get.mockResolvedValueOnce({ status: 200 });
+    client = new VLLMClient({ model: 'Qwen/Qwen2.5-7B-Instruct' });
+
+    await client.startServer();
+
+    // Default of 8 sequences, each scheduling 1 + 5 speculative tokens
+    const args = mockedSpawn.mock.calls[0][1] as string[];
+    const compilationConfig = JSON.parse(args[args.indexOf('--compilation-config') + 1]);
+    expect(compilationConfig.cudagraph_capture_sizes).toEqual([1, 2, 4, 8, 16, 32, 48]);
+  });
+
+  it('should not capture sizes beyond maxNumBatchedTokens', async () => {
+    mockedAxios.get.mockResolvedValueOnce({ status: 200 });
+    client = new VLLMClient({ model: 'Qwen/Qwen2.5-7B-Instruct', maxNumBatchedTokens: 32 });
+
+    await client.startServer();
+
+    // 8 sequences * (1 + 5) = 48 scheduled tokens, capped at 32
+    const args = mockedSpawn.mock.calls[0][1] as string[];
+    const compilationConfig = JSON.parse(args[args.indexOf('--compilation-config') + 1]);
+    expect(compilationConfig.cudagraph_capture_sizes).toEqual([1, 2, 4, 8, 16, 32]);
+  });
+});
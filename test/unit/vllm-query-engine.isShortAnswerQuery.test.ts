@@ -0,0 +1,38 @@
+// Keep the vector store and profile manager from touching Chroma or disk on import
+jest.mock('../../src/rag/persistent-vector-store', () => ({ PersistentVectorStore: jest.fn() }));
+jest.mock('../../src/student-profile', () => ({ studentProfileManager: {} }));
+
+import { VLLMQueryEngine } from '../../src/rag/vllm-query-engine';
+
+const isShortAnswerQuery = (query: string): boolean =>
+  (VLLMQueryEngine.prototype as any).isShortAnswerQuery(query);
+
+describe('VLLMQueryEngine.isShortAnswerQuery', () => {
+  it.each([
+    'what day is it?',
+    'What day is it',
+    'what day is today',
+    'what year is it?',
+    'what time is it',
+    'what is today?',
+    'what is the date',
+    "What is today's date?",
+    'what is todays date',
+    "what's the date today?",
+    '  what date is it ?  '
+  ])('should treat "%s" as a short-answer question', (query) => {
+    expect(isShortAnswerQuery(query)).toBe(true);
+  });
+
+  it.each([
+    "what is today's schedule",
+    "what is today's workload across all my courses",
+    'what is the date of every quiz this month',
+    'what day is it tomorrow and what is due',
+    'what is due today?',
+    'how many assignments are due this week?',
+    'show my grades'
+  ])('should keep the full budget for "%s"', (query) => {
+    expect(isShortAnswerQuery(query)).toBe(false);
+  });
+});